@@ -0,0 +1,243 @@
+import gzip
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Responses that carry no body and must not gain a Content-Length header.
+BODYLESS_STATUSES = {204, 304}
+
+
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    # Strictly greater keeps br ahead of gzip on equal quality.
+    for coding in candidates:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CachedResponse:
+    def __init__(self, status: int, raw_headers: List[Tuple[bytes, bytes]], body: bytes, expires_at: float):
+        self.status = status
+        self.raw_headers = raw_headers
+        self.expires_at = expires_at
+        # Keyed by content-coding; "identity" holds the uncompressed body and
+        # the compressed variants are filled in lazily on first request.
+        self.variants: Dict[str, bytes] = {"identity": body}
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, bytes], CachedResponse]" = OrderedDict()
+        # Bumped on every clear() so a read that started before a write cannot
+        # store its (now stale) response after the write invalidated the cache.
+        self.generation = 0
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(
+        self,
+        key: Tuple[str, bytes],
+        status: int,
+        raw_headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        generation: int,
+    ) -> CachedResponse:
+        entry = CachedResponse(status, raw_headers, body, time.monotonic() + self.ttl_seconds)
+        if generation != self.generation:
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.generation += 1
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        threadpool_min_size: int = 65536,
+        cache: Optional[ResponseCache] = None,
+        cacheable_prefixes: Sequence[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.threadpool_min_size = threadpool_min_size
+        self.cache = cache
+        self.cacheable_prefixes = tuple(cacheable_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = select_encoding(request_headers.get("accept-encoding", ""))
+        method = scope["method"]
+        cacheable_path = self.cache is not None and scope["path"].startswith(self.cacheable_prefixes)
+        cache_key = (scope["path"], scope.get("query_string", b""))
+
+        if cacheable_path and method == "GET":
+            generation = self.cache.generation
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                await self.send_cached(entry, encoding, send)
+                return
+
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                if cacheable_path and method in UNSAFE_METHODS and message["status"] < 400:
+                    self.cache.clear()
+                if (
+                    message["status"] < 200
+                    or message["status"] in BODYLESS_STATUSES
+                    or "content-encoding" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")
+                ):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            status = start_message["status"]
+            raw_headers = [
+                (name, value) for name, value in start_message["headers"]
+                if name.lower() != b"content-length"
+            ]
+
+            if cacheable_path and method == "GET" and status == 200 and self.is_storable(raw_headers):
+                entry = self.cache.set(cache_key, status, raw_headers, body, generation)
+                await self.send_cached(entry, encoding, send)
+                return
+
+            compressible = self.should_compress(raw_headers, body)
+            if encoding and compressible:
+                body = await self.compress(body, encoding)
+                await self.send_response(status, raw_headers, body, encoding, True, send)
+            else:
+                await self.send_response(status, raw_headers, body, None, compressible, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def should_compress(self, raw_headers: List[Tuple[bytes, bytes]], body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        content_type = Headers(raw=raw_headers).get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def is_storable(self, raw_headers: List[Tuple[bytes, bytes]]) -> bool:
+        headers = Headers(raw=raw_headers)
+        cache_control = headers.get("cache-control", "").lower()
+        return "set-cookie" not in headers and "no-store" not in cache_control and "private" not in cache_control
+
+    async def compress(self, body: bytes, encoding: str) -> bytes:
+        if len(body) >= self.threadpool_min_size:
+            return await run_in_threadpool(
+                compress_body, body, encoding, self.gzip_level, self.brotli_quality
+            )
+        return compress_body(body, encoding, self.gzip_level, self.brotli_quality)
+
+    async def send_cached(self, entry: CachedResponse, encoding: Optional[str], send: Send):
+        body = entry.variants["identity"]
+        compressible = self.should_compress(entry.raw_headers, body)
+        if encoding is None or not compressible:
+            await self.send_response(entry.status, entry.raw_headers, body, None, compressible, send)
+            return
+
+        compressed = entry.variants.get(encoding)
+        if compressed is None:
+            compressed = await self.compress(body, encoding)
+            entry.variants[encoding] = compressed
+        await self.send_response(entry.status, entry.raw_headers, compressed, encoding, True, send)
+
+    async def send_response(
+        self,
+        status: int,
+        raw_headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        encoding: Optional[str],
+        compressible: bool,
+        send: Send,
+    ):
+        headers = MutableHeaders(raw=list(raw_headers))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if compressible:
+            # The representation depends on Accept-Encoding even when this
+            # client got the identity body.
+            headers.add_vary_header("Accept-Encoding")
+        headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
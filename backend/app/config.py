@@ -16,6 +16,16 @@ class Settings(BaseSettings):
     ADMIN_PASSWORD: Optional[str] = None
     ADMIN_FULL_NAME: str = "Admin User"
 
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESSION_LEVEL: int = 6
+    BROTLI_COMPRESSION_QUALITY: int = 5
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = 65536
+
+    # Cached read responses (stored precompressed)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+
     class Config:
         env_file = ".env"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -8,7 +8,9 @@ book_tags = Table(
     'book_tags',
     Base.metadata,
     Column('book_id', Integer, ForeignKey('books.id'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True),
+    # The primary key leads with book_id, so tag filtering needs its own index.
+    Index('ix_book_tags_tag_id', 'tag_id')
 )
 
 
@@ -21,7 +23,7 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(50), default="user", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    reset_token = Column(String(255), nullable=True)
+    reset_token = Column(String(255), nullable=True, index=True)
     reset_token_expiry = Column(DateTime, nullable=True)
     books = relationship("Book", back_populates="creator")
 
@@ -39,6 +41,11 @@ class Book(Base):
     creator_id = Column(Integer, ForeignKey('users.id'))
     creator = relationship("User", back_populates="books")
     tags = relationship("Tag", secondary=book_tags, back_populates="books")
+    # Denormalized copy of `tags` for read paths; book_tags stays the source of truth.
+    tag_list = Column(JSON(none_as_null=True), nullable=True)
+
+    def sync_tag_list(self):
+        self.tag_list = [{"id": tag.id, "name": tag.name} for tag in self.tags]
 
 
 class Tag(Base):
@@ -25,6 +25,24 @@ async def get_or_create_tag(db: AsyncSession, tag_name: str) -> Tag:
     return tag
 
 
+def build_books_query(search: Optional[str] = None, tag: Optional[str] = None):
+    query = select(Book)
+    
+    if search:
+        search_pattern = f"%{search}%"
+        query = query.filter(
+            or_(
+                Book.title.ilike(search_pattern),
+                Book.author.ilike(search_pattern)
+            )
+        )
+    
+    if tag:
+        query = query.join(Book.tags).filter(Tag.name == tag.lower())
+    
+    return query
+
+
 @router.post("/", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
 async def create_book(
     book_data: BookCreate,
@@ -43,18 +61,12 @@ async def create_book(
         for tag_name in book_data.tags:
             tag = await get_or_create_tag(db, tag_name)
             new_book.tags.append(tag)
+    new_book.sync_tag_list()
     
     db.add(new_book)
     await db.commit()
     await db.refresh(new_book)
-    
-    result = await db.execute(
-        select(Book)
-        .options(selectinload(Book.tags))
-        .filter(Book.id == new_book.id)
-    )
-    book = result.scalar_one()
-    return book
+    return new_book
 
 
 @router.get("/", response_model=List[BookResponse])
@@ -65,21 +77,7 @@ async def get_books(
     tag: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Book).options(selectinload(Book.tags))
-    
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            or_(
-                Book.title.ilike(search_pattern),
-                Book.author.ilike(search_pattern)
-            )
-        )
-    
-    if tag:
-        query = query.join(Book.tags).filter(Tag.name == tag.lower())
-    
-    query = query.offset(skip).limit(limit)
+    query = build_books_query(search, tag).offset(skip).limit(limit)
     result = await db.execute(query)
     books = result.scalars().all()
     return books
@@ -87,11 +85,7 @@ async def get_books(
 
 @router.get("/{book_id}", response_model=BookResponse)
 async def get_book(book_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Book)
-        .options(selectinload(Book.tags))
-        .filter(Book.id == book_id)
-    )
+    result = await db.execute(select(Book).filter(Book.id == book_id))
     book = result.scalar_one_or_none()
     
     if not book:
@@ -110,11 +104,13 @@ async def update_book(
     current_user: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(Book)
-        .options(selectinload(Book.tags))
-        .filter(Book.id == book_id)
-    )
+    update_data = book_data.model_dump(exclude_unset=True)
+    tag_names = update_data.pop("tags", None)
+    
+    query = select(Book).filter(Book.id == book_id)
+    if tag_names is not None:
+        query = query.options(selectinload(Book.tags))
+    result = await db.execute(query)
     book = result.scalar_one_or_none()
     
     if not book:
@@ -123,15 +119,12 @@ async def update_book(
             detail="Book not found"
         )
     
-    update_data = book_data.model_dump(exclude_unset=True)
-    
-    if "tags" in update_data:
-        tag_names = update_data.pop("tags")
-        if tag_names is not None:
-            book.tags.clear()
-            for tag_name in tag_names:
-                tag = await get_or_create_tag(db, tag_name)
-                book.tags.append(tag)
+    if tag_names is not None:
+        book.tags.clear()
+        for tag_name in tag_names:
+            tag = await get_or_create_tag(db, tag_name)
+            book.tags.append(tag)
+        book.sync_tag_list()
     
     for field, value in update_data.items():
         setattr(book, field, value)
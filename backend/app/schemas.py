@@ -57,7 +57,11 @@ class BookResponse(BookBase):
     created_at: datetime
     updated_at: datetime
     creator_id: int
-    tags: List[TagResponse] = []
+    tags: List[TagResponse] = Field(default=[], validation_alias="tag_list")
+
+    @validator('tags', pre=True)
+    def default_tags(cls, v):
+        return v or []
 
     class Config:
         from_attributes = True
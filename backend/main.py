@@ -1,12 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from sqlalchemy import select
+from sqlalchemy import select, inspect, text
+from sqlalchemy.orm import selectinload
+from sqlalchemy.schema import CreateIndex
 from app.database import engine, Base, async_session_maker
 from app.routers import auth, books
-from app.models import User
+from app.models import User, Book
 from app.auth import get_password_hash
 from app.config import settings
+from app.compression import CompressionMiddleware, ResponseCache
 
 
 async def create_admin_user():
@@ -35,11 +38,48 @@ async def create_admin_user():
             print(f"User {settings.ADMIN_EMAIL} promoted to admin")
 
 
+def add_missing_columns(conn):
+    # create_all only creates missing tables, so columns added to existing
+    # tables are applied here.
+    columns = {column["name"] for column in inspect(conn).get_columns("books")}
+    if "tag_list" not in columns:
+        conn.execute(text("ALTER TABLE books ADD COLUMN tag_list JSON"))
+        print("Added books.tag_list column")
+
+
+def add_missing_indexes(conn):
+    # Same as add_missing_columns: indexes declared on existing tables are
+    # never created by create_all.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+async def backfill_tag_lists():
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Book)
+            .options(selectinload(Book.tags))
+            .filter(Book.tag_list.is_(None))
+        )
+        books = result.scalars().all()
+        
+        for book in books:
+            book.sync_tag_list()
+        
+        if books:
+            await session.commit()
+            print(f"Backfilled tag lists for {len(books)} books")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(add_missing_indexes)
     await create_admin_user()
+    await backfill_tag_lists()
     yield
     await engine.dispose()
 
@@ -51,6 +91,19 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+    brotli_quality=settings.BROTLI_COMPRESSION_QUALITY,
+    threadpool_min_size=settings.COMPRESSION_THREADPOOL_MIN_SIZE,
+    cache=ResponseCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+    ) if settings.RESPONSE_CACHE_MAX_ENTRIES > 0 else None,
+    cacheable_prefixes=("/books",)
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -0,0 +1,107 @@
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+# app.config requires these; the app engine is never connected during tests.
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/litbooks")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.database import Base  # noqa: E402
+from app.models import User, Book, Tag, book_tags  # noqa: E402
+
+
+SEED_USERS = 2000
+SEED_BOOKS = 20000
+SEED_TAGS = 200
+TAGS_PER_BOOK = 3
+PLAN_TEST_SCHEMA = "query_plan_test"
+
+
+def sync_url(url: str):
+    # Plans are captured over a sync connection, so swap the async drivers
+    # used by the app for their sync counterparts.
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+psycopg2")
+    return url.set(drivername="sqlite")
+
+
+def seed(conn):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    conn.execute(User.__table__.insert(), [
+        {
+            "id": i,
+            "full_name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": "x" * 60,
+            "role": "admin" if i == 1 else "user",
+            "created_at": now,
+            "reset_token": uuid.uuid4().hex if i % 10 == 0 else None,
+            "reset_token_expiry": now + timedelta(hours=1) if i % 10 == 0 else None,
+        }
+        for i in range(1, SEED_USERS + 1)
+    ])
+    conn.execute(Tag.__table__.insert(), [
+        {"id": i, "name": f"tag-{i}"} for i in range(1, SEED_TAGS + 1)
+    ])
+
+    books = []
+    links = []
+    for i in range(1, SEED_BOOKS + 1):
+        tag_ids = rng.sample(range(1, SEED_TAGS + 1), TAGS_PER_BOOK)
+        books.append({
+            "id": i,
+            "title": f"Book {i} {rng.choice(['river', 'night', 'garden', 'empire', 'letters'])}",
+            "author": f"Author {rng.randint(1, SEED_BOOKS // 10)}",
+            "description": "Lorem ipsum dolor sit amet. " * 20,
+            "image_url": f"https://example.com/covers/{i}.jpg",
+            "created_at": now,
+            "updated_at": now,
+            "creator_id": 1,
+            "tag_list": [{"id": tag_id, "name": f"tag-{tag_id}"} for tag_id in tag_ids],
+        })
+        links.extend({"book_id": i, "tag_id": tag_id} for tag_id in tag_ids)
+
+    conn.execute(Book.__table__.insert(), books)
+    conn.execute(book_tags.insert(), links)
+    conn.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="session")
+def plan_engine(tmp_path_factory):
+    url = os.environ.get("QUERY_PLAN_DATABASE_URL")
+    if not url:
+        url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    url = sync_url(url)
+
+    if url.get_backend_name() == "postgresql":
+        # Seed into a throwaway schema so a developer database is left untouched.
+        admin_engine = create_engine(url, isolation_level="AUTOCOMMIT")
+        with admin_engine.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {PLAN_TEST_SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {PLAN_TEST_SCHEMA}"))
+        engine = create_engine(
+            url, connect_args={"options": f"-csearch_path={PLAN_TEST_SCHEMA}"}
+        )
+    else:
+        admin_engine = None
+        engine = create_engine(url)
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed(conn)
+
+    yield engine
+
+    engine.dispose()
+    if admin_engine is not None:
+        with admin_engine.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {PLAN_TEST_SCHEMA} CASCADE"))
+        admin_engine.dispose()
@@ -0,0 +1,162 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base, get_db
+from app.dependencies import get_admin_user
+from app.models import User, Book, Tag, book_tags
+from app.routers import books
+import main
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def books_db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'books.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session:
+        admin = User(email="admin@example.com", full_name="Admin", hashed_password="x", role="admin")
+        session.add(admin)
+        await session.commit()
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    yield session_maker, admin, statements
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(books_db):
+    session_maker, admin, _ = books_db
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(books.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_admin_user] = lambda: admin
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def linked_tag_names(session_maker, book_id):
+    async with session_maker() as session:
+        result = await session.execute(
+            select(Tag.name)
+            .join(book_tags, book_tags.c.tag_id == Tag.id)
+            .filter(book_tags.c.book_id == book_id)
+        )
+        return sorted(result.scalars().all())
+
+
+def selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+@pytest.mark.anyio
+async def test_tags_follow_book_tags_after_create_and_update(client, books_db):
+    session_maker, _, _ = books_db
+
+    response = await client.post("/books/", json={"title": "Dune", "author": "Herbert", "tags": ["SciFi", "classic"]})
+    assert response.status_code == 201
+    book = response.json()
+    assert sorted(tag["name"] for tag in book["tags"]) == await linked_tag_names(session_maker, book["id"])
+
+    response = await client.put(f"/books/{book['id']}", json={"tags": ["desert", "scifi"]})
+    assert response.status_code == 200
+    updated = response.json()
+    assert sorted(tag["name"] for tag in updated["tags"]) == await linked_tag_names(session_maker, book["id"])
+    assert sorted(tag["name"] for tag in updated["tags"]) == ["desert", "scifi"]
+
+    response = await client.put(f"/books/{book['id']}", json={"title": "Dune Messiah"})
+    assert sorted(tag["name"] for tag in response.json()["tags"]) == ["desert", "scifi"]
+
+    fetched = (await client.get(f"/books/{book['id']}")).json()
+    assert fetched["tags"] == updated["tags"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", ["/books/", "/books/?tag=classic", "/books/{id}"])
+async def test_reads_issue_a_single_select(client, books_db, path):
+    _, _, statements = books_db
+    created = (await client.post("/books/", json={"title": "Emma", "author": "Austen", "tags": ["classic"]})).json()
+
+    statements.clear()
+    response = await client.get(path.format(id=created["id"]))
+
+    assert response.status_code == 200
+    assert len(selects(statements)) == 1, statements
+    body = response.json()
+    book = body[0] if isinstance(body, list) else body
+    assert [tag["name"] for tag in book["tags"]] == ["classic"]
+
+
+def use_engine_for_startup(monkeypatch, engine):
+    monkeypatch.setattr(main, "engine", engine)
+    monkeypatch.setattr(
+        main, "async_session_maker",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr(main.settings, "ADMIN_EMAIL", None)
+
+
+@pytest.mark.anyio
+async def test_startup_upgrades_books_table_without_tag_list(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        # Schema as it was before books.tag_list existed.
+        await conn.execute(text(
+            "CREATE TABLE books (id INTEGER PRIMARY KEY, title VARCHAR(255) NOT NULL, "
+            "author VARCHAR(255) NOT NULL, description TEXT, image_url VARCHAR(500), "
+            "created_at DATETIME, updated_at DATETIME, creator_id INTEGER)"
+        ))
+        await conn.execute(text("INSERT INTO books (id, title, author, creator_id) VALUES (1, 'Emma', 'Austen', 1)"))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("INSERT INTO tags (id, name) VALUES (1, 'classic')"))
+        await conn.execute(text("INSERT INTO book_tags (book_id, tag_id) VALUES (1, 1)"))
+
+    use_engine_for_startup(monkeypatch, engine)
+    async with main.lifespan(main.app):
+        async with main.async_session_maker() as session:
+            book = await session.get(Book, 1)
+            assert book.tag_list == [{"id": 1, "name": "classic"}]
+
+
+@pytest.mark.anyio
+async def test_startup_creates_indexes_missing_from_existing_tables(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("DROP INDEX ix_book_tags_tag_id"))
+        await conn.execute(text("DROP INDEX ix_users_reset_token"))
+
+    def index_names(conn):
+        inspector = inspect(conn)
+        return {
+            index["name"]
+            for table in ("book_tags", "users")
+            for index in inspector.get_indexes(table)
+        }
+
+    use_engine_for_startup(monkeypatch, engine)
+    async with main.lifespan(main.app):
+        async with engine.connect() as conn:
+            names = await conn.run_sync(index_names)
+
+    assert {"ix_book_tags_tag_id", "ix_users_reset_token"} <= names
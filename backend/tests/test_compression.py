@@ -0,0 +1,252 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+from app import compression
+from app.compression import CompressionMiddleware, ResponseCache, select_encoding
+
+
+requires_brotli = pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class StubBooksApp:
+    def __init__(self, size=4096):
+        self.payload = "old"
+        self.size = size
+        self.reads = 0
+        self.extra_headers = []
+        self.read_gate = None
+        self.write_status = 200
+
+    async def __call__(self, scope, receive, send):
+        if scope["method"] == "GET":
+            self.reads += 1
+            payload = self.payload
+            if self.read_gate is not None:
+                await self.read_gate.wait()
+            body = json.dumps({"payload": payload, "padding": "x" * self.size}).encode()
+        else:
+            self.payload = "new"
+            if self.write_status == 204:
+                await send({"type": "http.response.start", "status": 204, "headers": self.extra_headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            body = b"{}"
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers + self.extra_headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def make_client(stub, cache=True, **options):
+    options.setdefault("minimum_size", 1024)
+    app = CompressionMiddleware(
+        stub,
+        cache=ResponseCache(max_entries=16, ttl_seconds=60) if cache else None,
+        cacheable_prefixes=("/books",),
+        **options
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def fetch(client, method, url, accept_encoding="gzip"):
+    async with client.stream(method, url, headers={"Accept-Encoding": accept_encoding}) as response:
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, raw
+
+
+def decode(response, raw):
+    encoding = response.headers.get("content-encoding")
+    if encoding == "gzip":
+        raw = gzip.decompress(raw)
+    elif encoding == "br":
+        raw = compression.brotli.decompress(raw)
+    return json.loads(raw)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("GZIP ; q=0.5", "gzip"),
+    ("deflate, gzip;q=bad", None),
+    ("gzip;foo=bar;q=0", None),
+    ("gzip;level=1;q=0.4", "gzip"),
+])
+def test_select_encoding(header, expected):
+    assert select_encoding(header) == expected
+
+
+@requires_brotli
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("gzip;q=1, br;q=0.1", "gzip"),
+    ("br;q=0.5, gzip;q=0.5", "br"),
+    ("*", "br"),
+    ("*;q=0.3, gzip;q=0.8", "gzip"),
+    ("*, br;q=0", "gzip"),
+    ("br;q=0", None),
+])
+def test_select_encoding_with_brotli(header, expected):
+    assert select_encoding(header) == expected
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("accept_encoding", ["gzip", pytest.param("br", marks=requires_brotli)])
+async def test_compresses_large_responses(accept_encoding):
+    client = make_client(StubBooksApp(), cache=False)
+    async with client:
+        response, raw = await fetch(client, "GET", "/books/", accept_encoding)
+
+    assert response.headers["content-encoding"] == accept_encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["content-length"] == str(len(raw))
+    assert decode(response, raw)["payload"] == "old"
+
+
+@pytest.mark.anyio
+async def test_identity_response_still_varies_on_accept_encoding():
+    client = make_client(StubBooksApp(), cache=False)
+    async with client:
+        response, raw = await fetch(client, "GET", "/books/", "identity")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["content-length"] == str(len(raw))
+
+
+@pytest.mark.anyio
+async def test_small_responses_are_not_compressed():
+    client = make_client(StubBooksApp(size=10), cache=False)
+    async with client:
+        response, raw = await fetch(client, "GET", "/books/")
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert json.loads(raw)["payload"] == "old"
+
+
+@pytest.mark.anyio
+async def test_already_encoded_responses_pass_through():
+    stub = StubBooksApp()
+    stub.extra_headers = [(b"content-encoding", b"identity")]
+    client = make_client(stub, cache=False)
+    async with client:
+        response, raw = await fetch(client, "GET", "/books/")
+
+    assert response.headers["content-encoding"] == "identity"
+    assert json.loads(raw)["payload"] == "old"
+
+
+@pytest.mark.anyio
+async def test_large_bodies_are_compressed_in_threadpool(monkeypatch):
+    offloaded = []
+
+    async def fake_run_in_threadpool(func, *args):
+        offloaded.append(len(args[0]))
+        return func(*args)
+
+    monkeypatch.setattr(compression, "run_in_threadpool", fake_run_in_threadpool)
+    stub = StubBooksApp(size=8192)
+    client = make_client(stub, cache=False, threadpool_min_size=4096)
+    async with client:
+        await fetch(client, "GET", "/books/")
+        stub.size = 2048
+        await fetch(client, "GET", "/books/")
+
+    assert len(offloaded) == 1
+    assert offloaded[0] > 8192
+
+
+@pytest.mark.anyio
+async def test_cache_hit_reuses_compressed_bytes(monkeypatch):
+    calls = []
+    original = compression.compress_body
+
+    def counting_compress_body(*args):
+        calls.append(args[1])
+        return original(*args)
+
+    monkeypatch.setattr(compression, "compress_body", counting_compress_body)
+    stub = StubBooksApp()
+    client = make_client(stub)
+    async with client:
+        first, first_raw = await fetch(client, "GET", "/books/")
+        second, second_raw = await fetch(client, "GET", "/books/")
+        identity, identity_raw = await fetch(client, "GET", "/books/", "identity")
+
+    assert stub.reads == 1
+    assert calls == ["gzip"]
+    assert first_raw == second_raw
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.headers["content-length"] == str(len(second_raw))
+    assert json.loads(identity_raw)["payload"] == "old"
+
+
+@pytest.mark.anyio
+async def test_uncacheable_responses_are_not_stored():
+    stub = StubBooksApp()
+    stub.extra_headers = [(b"cache-control", b"no-store")]
+    client = make_client(stub)
+    async with client:
+        await fetch(client, "GET", "/books/")
+        await fetch(client, "GET", "/books/")
+
+    assert stub.reads == 2
+
+
+@pytest.mark.anyio
+async def test_write_invalidates_cache():
+    stub = StubBooksApp()
+    client = make_client(stub)
+    async with client:
+        before = decode(*await fetch(client, "GET", "/books/"))
+        await fetch(client, "POST", "/books/")
+        after = decode(*await fetch(client, "GET", "/books/"))
+
+    assert before["payload"] == "old"
+    assert after["payload"] == "new"
+    assert stub.reads == 2
+
+
+@pytest.mark.anyio
+async def test_read_racing_a_write_is_not_cached():
+    stub = StubBooksApp()
+    stub.read_gate = asyncio.Event()
+    client = make_client(stub)
+    async with client:
+        in_flight = asyncio.create_task(fetch(client, "GET", "/books/"))
+        while stub.reads == 0:
+            await asyncio.sleep(0)
+        await fetch(client, "POST", "/books/")
+        stub.read_gate.set()
+        stale = decode(*await in_flight)
+        fresh = decode(*await fetch(client, "GET", "/books/"))
+
+    assert stale["payload"] == "old"
+    assert fresh["payload"] == "new"
+
+
+@pytest.mark.anyio
+async def test_no_content_response_passes_through_and_invalidates():
+    stub = StubBooksApp()
+    stub.write_status = 204
+    client = make_client(stub)
+    async with client:
+        await fetch(client, "GET", "/books/")
+        response, raw = await fetch(client, "DELETE", "/books/1")
+        after = decode(*await fetch(client, "GET", "/books/"))
+
+    assert response.status_code == 204
+    assert raw == b""
+    assert "content-length" not in response.headers
+    assert "vary" not in response.headers
+    assert after["payload"] == "new"
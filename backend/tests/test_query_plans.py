@@ -0,0 +1,153 @@
+import json
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.database import Base
+from app.models import User, Book
+from app.routers.books import build_books_query
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "sqlite")
+def compile_explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "postgresql")
+def compile_explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+# name -> (statement mirroring the router query, table names (not aliases)
+# allowed to be fully scanned, max planner cost as a fraction of a full scan
+# of books).
+# Listing reads the first page without an ORDER BY and the search is a
+# leading-wildcard ILIKE, so both scan books by design; the cost ceiling is
+# what keeps them bounded by the LIMIT. tags is a couple of pages, which
+# PostgreSQL reads whole rather than through ix_tags_name; the tag filter
+# must still reach book_tags and books through their indexes.
+HOT_QUERIES = {
+    "list_books": (
+        lambda: build_books_query().offset(0).limit(100),
+        {"books"},
+        0.05,
+    ),
+    "filter_by_tag": (
+        lambda: build_books_query(tag="tag-7").offset(0).limit(100),
+        {"tags"},
+        0.25,
+    ),
+    "search_books": (
+        lambda: build_books_query(search="night").offset(0).limit(100),
+        {"books"},
+        0.1,
+    ),
+    "get_book_by_id": (
+        lambda: select(Book).filter(Book.id == 1234),
+        set(),
+        0.02,
+    ),
+    "get_user_by_email": (
+        lambda: select(User).filter(User.email == "user1234@example.com"),
+        set(),
+        0.02,
+    ),
+    "get_user_by_reset_token": (
+        lambda: select(User).filter(
+            User.reset_token == "0123456789abcdef",
+            User.reset_token_expiry > datetime.utcnow()
+        ),
+        set(),
+        0.02,
+    ),
+}
+
+
+def table_name(alias):
+    # SQLite reports the alias SQLAlchemy gave a joined table (book_tags_1);
+    # PostgreSQL reports the relation itself, so map back to that.
+    if alias in Base.metadata.tables:
+        return alias
+    return re.sub(r"_\d+$", "", alias)
+
+
+def sqlite_plan(conn, statement):
+    rows = conn.execute(Explain(statement)).all()
+    details = [row[3] for row in rows]
+    scanned = set()
+    for detail in details:
+        match = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+        if match:
+            scanned.add(table_name(match.group(1)))
+    # SQLite does not expose cost estimates.
+    return scanned, None, "\n".join(details)
+
+
+def postgresql_plan(conn, statement):
+    plan = conn.execute(Explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+
+    scanned = set()
+    nodes = [root]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scanned.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+
+    return scanned, root["Total Cost"], json.dumps(plan, indent=2)
+
+
+def capture_plan(engine, statement):
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return postgresql_plan(conn, statement)
+        return sqlite_plan(conn, statement)
+
+
+@pytest.fixture(scope="module")
+def full_scan_cost(plan_engine):
+    _, cost, _ = capture_plan(plan_engine, select(Book))
+    return cost
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_plan(plan_engine, full_scan_cost, name):
+    build_statement, allowed_scans, max_cost_ratio = HOT_QUERIES[name]
+    if "books" in allowed_scans and full_scan_cost is None:
+        pytest.skip(f"{name} may scan books, so only a cost ceiling can catch a regression")
+    scanned, cost, plan_text = capture_plan(plan_engine, build_statement())
+
+    unexpected = scanned - allowed_scans
+    assert not unexpected, (
+        f"{name} now does a full scan of {sorted(unexpected)}:\n{plan_text}"
+    )
+
+    if cost is not None:
+        max_cost = full_scan_cost * max_cost_ratio
+        assert cost <= max_cost, (
+            f"{name} estimated cost {cost} exceeds {max_cost:.2f}:\n{plan_text}"
+        )
+
+
+@pytest.mark.parametrize("alias, expected", [
+    ("books", "books"),
+    ("book_tags", "book_tags"),
+    ("book_tags_1", "book_tags"),
+    ("books_2", "books"),
+])
+def test_table_name_maps_sqlite_aliases(alias, expected):
+    assert table_name(alias) == expected